@@ -4,6 +4,7 @@ import pandas as pd
 import sqlite3
 import logging
 import re
+import threading
 from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -12,41 +13,77 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 logging.basicConfig(filename='wms.log', level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
+DB_PATH = 'wms_database.db'
+
+# Column type hints for CSV parsing (skips pandas type inference)
+SALES_DTYPES = {
+    'Order Id': 'string',
+    'SKU': 'string',
+    'Product': 'string',
+    'Quantity': 'Int32',
+    'Invoice Amount': 'float64',
+    'Ordered On': 'string',  # parsed per chunk by WMSApp._parse_order_dates
+    'State': 'category'
+}
+# Non-ISO order dates (e.g. 05/01/2024) are day-first; ISO 8601 dates are parsed as such
+SALES_DATE_DAYFIRST = True
+MAPPING_DTYPES = {'SKU': 'string', 'MSKU': 'category', 'marketplace': 'category'}
+
+# Rows parsed and ingested per chunk when streaming a sales CSV
+SALES_CHUNK_SIZE = 50_000
+
+# Rows inserted into the Treeview per page; further pages load on scroll
+TREE_PAGE_SIZE = 1000
+
+# Built-in SKU -> MSKU mappings, seeded into msku_mappings on startup
+_PREDEFINED = {
+    'MUSIC_BOX': [
+        'MTYGAUZJFZAAZXYJ', 'MTYGFYU2AXY4VUYQ', 'MTYGYX7YB7DJ5HSF',
+        'MTYGF8CKEZVGPZGX', 'MTYGYZGGV5NGQRXG', 'MBXGPK2WHAWYW4UF',
+        'MTYGADJZHJYSDTXB', 'MTYGACBNGZPTDBGZ', 'MBXF894GJXNQ79DN',
+        'MTYGYZJRGAKY3AEJ', 'OTYGU29RCH3FZZP8', 'OTYGU25AZFNXZRXX'
+    ],
+    'PLUSH_TOY': [
+        'STFH8CZHGFBB8RHP', 'STFH6QTVHNR3JSYZ', 'STFH76G8G2ZAGFVZ',
+        'STFH6QQNDEQTBMCK', 'STFH6QTDZDU3JMTG', 'STFH63ZFB9NC9NZQ',
+        'STFH74ECSV8DWJHF', 'STFH6FDUWS2FRN4T', 'STFH6GXUYCBZGQB5',
+        'STFH8CZKNCEHTG2A', 'STFH6GYMKWBPBFQ5', 'STFH6MNQVEXTFE7S',
+        'STFG4PZP2YENG4NN', 'STFH6GYEKCGYZQ5M'
+    ],
+    'SUNGLASSES': [
+        'SGLG5E7ZZWHFNTFH', 'SGLGQSDZH7TP4CTF', 'SGLGQQ9QN2M6TFH7',
+        'SGLGFYUGHZHXSZWD', 'SGLGQSHAWZZEJPHW'
+    ],
+    'TOY_WEAPON': [
+        'TWPH6ZHTQ3STVASV', 'STFH6QPFQHH9FHZH', 'STFH6QQNDEQTBMCK',
+        'OTYGUM6DFKP8WTNW', 'OTYGUGHAGZNTZTCZ'
+    ],
+    'MUSIC_INSTRUMENT': [
+        'PNLGT3YH6CHBRXRS', 'PNLGT3YMUSHSEPXA'
+    ],
+    'WATCH': ['WATG5ATMAD7U2KGS']
+}
+# Inverted sku -> msku form; the first MSKU listing a SKU wins, matching INSERT OR IGNORE seeding
+_PREDEFINED_INV = {}
+for _msku, _skus in _PREDEFINED.items():
+    for _sku in _skus:
+        _PREDEFINED_INV.setdefault(_sku, _msku)
+
 class SKUMapper:
+    # Basic SKU format (alphanumeric with optional hyphens)
+    _SKU_RE = re.compile(r'^[A-Za-z0-9\-]+$')
+
     def __init__(self, conn):
         self.conn = conn
         self.msku_mappings = {}
-        self.predefined_mappings = {
-            'MUSIC_BOX': [
-                'MTYGAUZJFZAAZXYJ', 'MTYGFYU2AXY4VUYQ', 'MTYGYX7YB7DJ5HSF',
-                'MTYGF8CKEZVGPZGX', 'MTYGYZGGV5NGQRXG', 'MBXGPK2WHAWYW4UF',
-                'MTYGADJZHJYSDTXB', 'MTYGACBNGZPTDBGZ', 'MBXF894GJXNQ79DN',
-                'MTYGYZJRGAKY3AEJ', 'OTYGU29RCH3FZZP8', 'OTYGU25AZFNXZRXX'
-            ],
-            'PLUSH_TOY': [
-                'STFH8CZHGFBB8RHP', 'STFH6QTVHNR3JSYZ', 'STFH76G8G2ZAGFVZ',
-                'STFH6QQNDEQTBMCK', 'STFH6QTDZDU3JMTG', 'STFH63ZFB9NC9NZQ',
-                'STFH74ECSV8DWJHF', 'STFH6FDUWS2FRN4T', 'STFH6GXUYCBZGQB5',
-                'STFH8CZKNCEHTG2A', 'STFH6GYMKWBPBFQ5', 'STFH6MNQVEXTFE7S',
-                'STFG4PZP2YENG4NN', 'STFH6GYEKCGYZQ5M'
-            ],
-            'SUNGLASSES': [
-                'SGLG5E7ZZWHFNTFH', 'SGLGQSDZH7TP4CTF', 'SGLGQQ9QN2M6TFH7',
-                'SGLGFYUGHZHXSZWD', 'SGLGQSHAWZZEJPHW'
-            ],
-            'TOY_WEAPON': [
-                'TWPH6ZHTQ3STVASV', 'STFH6QPFQHH9FHZH', 'STFH6QQNDEQTBMCK',
-                'OTYGUM6DFKP8WTNW', 'OTYGUGHAGZNTZTCZ'
-            ],
-            'MUSIC_INSTRUMENT': [
-                'PNLGT3YH6CHBRXRS', 'PNLGT3YMUSHSEPXA'
-            ],
-            'WATCH': ['WATG5ATMAD7U2KGS']
-        }
+        self.predefined_mappings = _PREDEFINED
+        # One cursor shared by every SKUMapper operation
+        self._cur = self.conn.cursor()
         self.create_tables()
+        self.preload_mappings()
 
     def create_tables(self):
-        cursor = self.conn.cursor()
+        cursor = self._cur
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS msku_mappings (
                 sku TEXT PRIMARY KEY,
@@ -62,7 +99,7 @@ class SKUMapper:
                 msku TEXT,
                 quantity INTEGER,
                 price REAL,
-                date TIMESTAMP,
+                date INTEGER,
                 marketplace TEXT,
                 state TEXT
             )
@@ -75,54 +112,81 @@ class SKUMapper:
                 stock_quantity INTEGER
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sales_msku ON sales_data(msku)')
+        # Covers the per-SKU report aggregate; supersedes the plain sku index
+        cursor.execute('DROP INDEX IF EXISTS idx_sales_sku')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sales_sku_totals ON sales_data(sku, msku, quantity, price)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sales_date ON sales_data(date)')
         self.conn.commit()
         # Populate predefined mappings
-        for msku, skus in self.predefined_mappings.items():
-            for sku in skus:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO msku_mappings (sku, msku, marketplace, last_updated)
-                    VALUES (?, ?, ?, ?)
-                ''', (sku, msku, 'default', datetime.now()))
-        self.conn.commit()
+        now = datetime.now()
+        rows = [(sku, msku, 'default', now) for sku, msku in _PREDEFINED_INV.items()]
+        with self.conn:
+            cursor.execute('BEGIN')
+            cursor.executemany('''
+                INSERT OR IGNORE INTO msku_mappings (sku, msku, marketplace, last_updated)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+
+    def preload_mappings(self):
+        cursor = self._cur
+        cursor.execute('SELECT sku, msku, marketplace FROM msku_mappings')
+        for sku, msku, marketplace in cursor.fetchall():
+            self.msku_mappings[sku] = {'msku': msku, 'marketplace': marketplace}
 
     def load_mappings(self, mapping_file):
         try:
-            df = pd.read_csv(mapping_file)
-            cursor = self.conn.cursor()
-            for _, row in df.iterrows():
-                sku = row['SKU']
-                msku = row['MSKU']
-                marketplace = row.get('marketplace', 'default')
-                cursor.execute('''
+            df = pd.read_csv(mapping_file, dtype=MAPPING_DTYPES, engine='c', na_filter=False)
+            valid = self.validate_sku_batch(df['SKU'])
+            if not valid.all():
+                logging.warning(f"Skipping {(~valid).sum()} mappings with invalid SKU format")
+                df = df[valid]
+            marketplaces = df['marketplace'] if 'marketplace' in df.columns else ['default'] * len(df)
+            now = datetime.now()
+            rows = [(sku, msku, marketplace, now)
+                    for sku, msku, marketplace in zip(df['SKU'], df['MSKU'], marketplaces)]
+            cursor = self._cur
+            with self.conn:
+                cursor.execute('BEGIN')
+                cursor.executemany('''
                     INSERT OR REPLACE INTO msku_mappings (sku, msku, marketplace, last_updated)
                     VALUES (?, ?, ?, ?)
-                ''', (sku, msku, marketplace, datetime.now()))
+                ''', rows)
+            for sku, msku, marketplace, _ in rows:
                 self.msku_mappings[sku] = {'msku': msku, 'marketplace': marketplace}
-            self.conn.commit()
             logging.info(f"Loaded {len(df)} SKU mappings from file")
         except Exception as e:
             logging.error(f"Error loading mappings: {str(e)}")
             raise
 
     def validate_sku_format(self, sku):
-        # Basic SKU format validation (alphanumeric with optional hyphens)
-        pattern = r'^[A-Za-z0-9\-]+$'
-        return bool(re.match(pattern, sku))
+        return bool(self._SKU_RE.match(sku))
 
     def map_sku(self, sku):
         if not self.validate_sku_format(sku):
             logging.warning(f"Invalid SKU format: {sku}")
             return None
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT msku FROM msku_mappings WHERE sku = ?', (sku,))
-        result = cursor.fetchone()
-        return result[0] if result else 'UNKNOWN'
+        # msku_mappings mirrors the table (preloaded, kept in sync on save/load)
+        mapping = self.msku_mappings.get(sku)
+        return mapping['msku'] if mapping is not None else 'UNKNOWN'
+
+    def validate_sku_batch(self, skus):
+        # Vectorized validate_sku_format; missing SKUs count as invalid
+        return skus.astype(object).str.match(self._SKU_RE.pattern).fillna(False).astype(bool)
+
+    def map_sku_batch(self, skus):
+        # Resolve a whole column of SKUs with one query and a hashed join;
+        # callers validate the column first with validate_sku_batch
+        map_df = pd.read_sql_query('SELECT sku, msku FROM msku_mappings', self.conn)
+        skus = skus.astype(object)
+        merged = pd.DataFrame({'sku': skus}).merge(map_df, on='sku', how='left')
+        return pd.Series(merged['msku'].fillna('UNKNOWN').to_numpy(), index=skus.index, dtype=object)
 
     def save_mapping(self, sku, msku, marketplace='default'):
         if not self.validate_sku_format(sku):
             logging.warning(f"Invalid SKU format: {sku}")
             raise ValueError("Invalid SKU format")
-        cursor = self.conn.cursor()
+        cursor = self._cur
         cursor.execute('''
             INSERT OR REPLACE INTO msku_mappings (sku, msku, marketplace, last_updated)
             VALUES (?, ?, ?, ?)
@@ -136,9 +200,22 @@ class WMSApp:
         self.root = root
         self.root.title("Warehouse Management System")
         self.root.geometry("1200x800")
-        self.conn = sqlite3.connect('wms_database.db')
+        # Autocommit mode; bulk loads manage their own BEGIN/COMMIT
+        self.conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA cache_size=-65536')  # 64MB page cache
+        self.conn.execute('PRAGMA mmap_size=268435456')
+        self._cursor = self.conn.cursor()
         self.sku_mapper = SKUMapper(self.conn)
-        self.sales_data = None
+        self._fetch_page = None
+        self._tree_offset = 0
+        self._tree_exhausted = True
+        self._report_fig = None
+        self._report_ax1 = None
+        self._report_ax2 = None
+        self._report_canvas = None
         self.setup_gui()
 
     def setup_gui(self):
@@ -173,12 +250,13 @@ class WMSApp:
         self.tree.heading('Price', text='Price (INR)')
         self.tree.heading('Date', text='Order Date')
         self.tree.heading('State', text='State')
+        self._size_tree_columns()
         self.tree.grid(row=4, column=0, columnspan=4, pady=10, sticky=(tk.W, tk.E))
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        scrollbar.grid(row=4, column=4, sticky=(tk.N, tk.S))
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree_scrollbar.grid(row=4, column=4, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
         
         # Plot frame
         self.plot_frame = ttk.Frame(main_frame)
@@ -188,7 +266,8 @@ class WMSApp:
         ttk.Label(main_frame, text="SQL Query:").grid(row=6, column=0, pady=5)
         self.query_entry = ttk.Entry(main_frame, width=50)
         self.query_entry.grid(row=6, column=1, columnspan=3, pady=5)
-        ttk.Button(main_frame, text="Execute Query", command=self.execute_query).grid(row=7, column=0, columnspan=4, pady=5)
+        self.query_button = ttk.Button(main_frame, text="Execute Query", command=self.execute_query)
+        self.query_button.grid(row=7, column=0, columnspan=4, pady=5)
 
     def load_mapping_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
@@ -204,37 +283,73 @@ class WMSApp:
         file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if file_path:
             try:
-                self.sales_data = pd.read_csv(file_path)
-                self.process_sales_data()
+                # Stream the file in chunks within a single transaction, so a failure
+                # part-way through leaves nothing behind
+                with self.conn:
+                    self._cursor.execute('BEGIN')
+                    for chunk in pd.read_csv(file_path, dtype=SALES_DTYPES, engine='c',
+                                             chunksize=SALES_CHUNK_SIZE):
+                        self.process_sales_data(chunk)
+                        self.display_sales_data()
                 messagebox.showinfo("Success", "Sales data loaded successfully")
             except Exception as e:
                 logging.error(f"Failed to load sales data: {str(e)}")
-                messagebox.showerror("Error", f"Failed to load sales data: {str(e)}")
-
-    def process_sales_data(self):
-        cursor = self.conn.cursor()
-        for _, row in self.sales_data.iterrows():
-            sku = row['SKU']
-            msku = self.sku_mapper.map_sku(sku)
-            product_name = row['Product']
-            quantity = int(row['Quantity'])
-            price = float(row['Invoice Amount'])
-            order_id = row['Order Id']
-            date = row['Ordered On']
-            state = row['State']
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO sales_data (order_id, sku, msku, quantity, price, date, marketplace, state)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (order_id, sku, msku, quantity, price, date, 'default', state))
-            
-            # Update inventory (default stock quantity for demo)
-            cursor.execute('''
-                INSERT OR REPLACE INTO inventory (sku, msku, product_name, stock_quantity)
-                VALUES (?, ?, ?, ?)
-            ''', (sku, msku, product_name, 100))  # Default stock for demo
-        self.conn.commit()
-        self.display_sales_data()
+                messagebox.showerror("Error", f"Failed to load sales data, no rows were saved: {str(e)}")
+                self.display_sales_data()
+
+    def process_sales_data(self, chunk):
+        # Caller holds the transaction
+        valid = self.sku_mapper.validate_sku_batch(chunk['SKU'])
+        if not valid.all():
+            logging.warning(f"Dropping {(~valid).sum()} sales rows with invalid SKU format")
+            chunk = chunk[valid].copy()
+        chunk['MSKU'] = self.sku_mapper.map_sku_batch(chunk['SKU'])
+        out = chunk.rename(columns={
+            'Order Id': 'order_id', 'SKU': 'sku', 'MSKU': 'msku', 'Product': 'product_name',
+            'Quantity': 'quantity', 'Invoice Amount': 'price', 'Ordered On': 'date', 'State': 'state'
+        })
+        # Store order dates as unix epoch seconds
+        dates = self._parse_order_dates(out['date'])
+        out['date'] = ((dates - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).astype('Int64')
+        out['marketplace'] = 'default'
+        out['stock_quantity'] = 100  # Default stock for demo
+        
+        # Stage the frame in bulk, then move it into place with set-based inserts
+        sales_cols = ['order_id', 'sku', 'msku', 'quantity', 'price', 'date', 'marketplace', 'state']
+        inventory_cols = ['sku', 'msku', 'product_name', 'stock_quantity']
+        # One inventory row per SKU; the last occurrence wins, as the per-row REPLACE did
+        inventory = out[inventory_cols].drop_duplicates('sku', keep='last')
+        cursor = self._cursor
+        for table, cols, frame in (('sales_stage', sales_cols, out[sales_cols]),
+                                   ('inventory_stage', inventory_cols, inventory)):
+            # Plain Python values (None for missing) so sqlite3 can bind them
+            rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+            cursor.execute(f'CREATE TEMP TABLE {table} ({", ".join(cols)})')
+            cursor.executemany(
+                f'INSERT INTO {table} VALUES ({", ".join("?" * len(cols))})', rows
+            )
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO sales_data ({', '.join(sales_cols)})
+            SELECT {', '.join(sales_cols)} FROM sales_stage
+        ''')
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO inventory ({', '.join(inventory_cols)})
+            SELECT {', '.join(inventory_cols)} FROM inventory_stage
+        ''')
+        cursor.execute('DROP TABLE temp.sales_stage')
+        cursor.execute('DROP TABLE temp.inventory_stage')
+
+    def _parse_order_dates(self, dates):
+        # Naive values are taken as UTC and offsets are normalised; unparseable values become NaT
+        parsed = pd.to_datetime(dates, format='ISO8601', utc=True, errors='coerce')
+        rest = parsed.isna() & dates.notna()
+        if rest.any():
+            parsed[rest] = pd.to_datetime(dates[rest], format='mixed', dayfirst=SALES_DATE_DAYFIRST,
+                                          utc=True, errors='coerce')
+            failed = parsed.isna() & dates.notna()
+            if failed.any():
+                logging.warning(f"Unparseable order date in {failed.sum()} rows, stored as NULL")
+        return parsed
 
     def map_sku(self):
         sku = self.sku_entry.get()
@@ -250,105 +365,186 @@ class WMSApp:
         else:
             messagebox.showerror("Error", "Please enter both SKU and MSKU")
 
-    def display_sales_data(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def _query_page(self, query):
+        def fetch_page(offset, limit):
+            cursor = self._cursor
+            cursor.execute(f'{query} LIMIT ? OFFSET ?', (limit, offset))
+            return cursor.fetchall()
+        return fetch_page
+
+    def _size_tree_columns(self):
+        # Fixed widths up front so inserts never trigger column re-measuring
+        for col in self.tree['columns']:
+            self.tree.column(col, width=120, stretch=False, anchor='w')
+
+    def _set_tree_source(self, fetch_page):
+        # fetch_page(offset, limit) -> rows
+        self._fetch_page = fetch_page
+        self._tree_offset = 0
+        self._tree_exhausted = False
+        self._load_tree_page(refresh=True)
+
+    def _load_tree_page(self, refresh=False):
+        if self._tree_exhausted and not refresh:
+            return
+        start = self._tree_offset
+        rows = self._fetch_page(start, TREE_PAGE_SIZE)
+        self._tree_offset += len(rows)
+        self._tree_exhausted = len(rows) < TREE_PAGE_SIZE
         
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT order_id, sku, msku, product_name, quantity, price, date, state FROM sales_data')
-        for row in cursor.fetchall():
-            self.tree.insert('', 'end', values=row)
+        # Hide columns while inserting to skip per-row layout
+        displaycolumns = self.tree['displaycolumns']
+        self.tree.configure(displaycolumns=())
+        if refresh:
+            self.tree.delete(*self.tree.get_children())
+        # Positional ids: row keys (e.g. order_id) may be NULL or repeat
+        for i, row in enumerate(rows, start):
+            self.tree.insert('', 'end', iid=str(i), values=row)
+        self.tree.configure(displaycolumns=displaycolumns)
+        self.tree.update_idletasks()
+
+    def _on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        if float(last) >= 1.0 and not self._tree_exhausted:
+            self.root.after_idle(self._load_tree_page)
+
+    def display_sales_data(self):
+        self._set_tree_source(self._query_page('''
+            SELECT s.order_id, s.sku, s.msku, i.product_name, s.quantity, s.price,
+                   CASE WHEN typeof(s.date) = 'integer' THEN datetime(s.date, 'unixepoch') ELSE s.date END,
+                   s.state
+            FROM sales_data s LEFT JOIN inventory i ON i.sku = s.sku
+            ORDER BY s.rowid
+        '''))
 
     def generate_sales_report(self):
-        if self.sales_data is None:
+        self._cursor.execute('SELECT EXISTS (SELECT 1 FROM sales_data)')
+        if not self._cursor.fetchone()[0]:
             messagebox.showwarning("Warning", "Please load sales data first")
             return
         
-        # Clear previous plot
-        for widget in self.plot_frame.winfo_children():
-            widget.destroy()
-        
-        # Sales by MSKU
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+        # Aggregate per SKU off the covering index, then resolve the (few) SKUs
+        # against the current mappings
+        sales_by_msku = pd.read_sql_query('''
+            SELECT COALESCE(m.msku, 'UNKNOWN') AS msku, SUM(t.quantity) AS quantity, SUM(t.revenue) AS revenue
+            FROM (
+                SELECT sku, SUM(quantity) AS quantity, SUM(price) AS revenue
+                FROM sales_data
+                WHERE msku IS NOT NULL
+                GROUP BY sku
+            ) t LEFT JOIN msku_mappings m ON m.sku = t.sku
+            GROUP BY 1
+        ''', self.conn)
         
-        # Process data
-        self.sales_data['MSKU'] = self.sales_data['SKU'].apply(self.sku_mapper.map_sku)
-        sales_by_msku = self.sales_data.groupby('MSKU').agg({'Quantity': 'sum', 'Invoice Amount': 'sum'}).reset_index()
+        # Reuse the report figure and canvas across refreshes
+        report_widget = self._report_canvas.get_tk_widget() if self._report_canvas is not None else None
+        if self._report_fig is None:
+            self._report_fig, (self._report_ax1, self._report_ax2) = plt.subplots(1, 2, figsize=(12, 5))
+        if report_widget is None or not report_widget.winfo_exists():
+            self._report_canvas = FigureCanvasTkAgg(self._report_fig, master=self.plot_frame)
+            report_widget = self._report_canvas.get_tk_widget()
+        for widget in self.plot_frame.winfo_children():
+            if str(widget) != str(report_widget):
+                widget.destroy()
+        ax1, ax2 = self._report_ax1, self._report_ax2
+        ax1.clear()
+        ax2.clear()
         
         # Bar plot for quantity
-        ax1.bar(sales_by_msku['MSKU'], sales_by_msku['Quantity'], color='#1f77b4')
+        ax1.bar(sales_by_msku['msku'], sales_by_msku['quantity'], color='#1f77b4')
         ax1.set_title('Sales Quantity by MSKU')
         ax1.set_xlabel('MSKU')
         ax1.set_ylabel('Quantity')
         ax1.tick_params(axis='x', rotation=45)
         
         # Bar plot for revenue
-        ax2.bar(sales_by_msku['MSKU'], sales_by_msku['Invoice Amount'], color='#ff7f0e')
+        ax2.bar(sales_by_msku['msku'], sales_by_msku['revenue'], color='#ff7f0e')
         ax2.set_title('Revenue by MSKU')
         ax2.set_xlabel('MSKU')
         ax2.set_ylabel('Revenue (INR)')
         ax2.tick_params(axis='x', rotation=45)
         
-        plt.tight_layout()
+        self._report_fig.tight_layout()
         
         # Embed plot in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack()
+        self._report_canvas.draw_idle()
+        if not report_widget.winfo_manager():
+            report_widget.pack()
 
     def view_inventory(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         self.tree.configure(columns=('SKU', 'MSKU', 'Product', 'Stock Quantity'))
         self.tree.heading('SKU', text='SKU')
         self.tree.heading('MSKU', text='MSKU')
         self.tree.heading('Product', text='Product Name')
         self.tree.heading('Stock Quantity', text='Stock Quantity')
+        self._size_tree_columns()
         
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT sku, msku, product_name, stock_quantity FROM inventory')
-        for row in cursor.fetchall():
-            self.tree.insert('', 'end', values=row)
+        self._set_tree_source(self._query_page(
+            'SELECT sku, msku, product_name, stock_quantity FROM inventory ORDER BY sku'
+        ))
 
     def execute_query(self):
         query = self.query_entry.get()
+        self.query_button.state(['disabled'])
+        threading.Thread(target=self._run_query, args=(query,), daemon=True).start()
+
+    def _run_query(self, query):
+        # Runs off the Tk thread on its own connection; results are handed back via after()
         try:
-            df = pd.read_sql_query(query, self.conn)
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            # Update treeview columns based on query results
-            self.tree.configure(columns=tuple(df.columns), show='headings')
-            for col in df.columns:
-                self.tree.heading(col, text=col)
-            
-            for _, row in df.iterrows():
-                self.tree.insert('', 'end', values=tuple(row))
-            
-            # Update visualization if applicable
-            if 'SELECT' in query.upper() and len(df.columns) >= 2:
-                for widget in self.plot_frame.winfo_children():
-                    widget.destroy()
-                
-                fig, ax = plt.subplots(figsize=(8, 4))
-                if df.select_dtypes(include=['int64', 'float64']).columns.size > 0:
-                    numeric_col = df.select_dtypes(include=['int64', 'float64']).columns[0]
-                    df.groupby(df.columns[0])[numeric_col].sum().plot(kind='bar', ax=ax, color='#2ca02c')
-                    ax.set_title('Query Results')
-                    ax.set_xlabel(df.columns[0])
-                    ax.set_ylabel(numeric_col)
-                    ax.tick_params(axis='x', rotation=45)
-                    canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-                    canvas.draw()
-                    canvas.get_tk_widget().pack()
-            
-            messagebox.showinfo("Query Result", f"Query executed successfully. Rows returned: {len(df)}")
+            conn = sqlite3.connect(DB_PATH, isolation_level=None)
+            try:
+                df = pd.read_sql_query(query, conn)
+            finally:
+                conn.close()
+            plot_data = None
+            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+            if 'SELECT' in query.upper() and len(df.columns) >= 2 and numeric_cols.size > 0:
+                plot_data = df.groupby(df.columns[0])[numeric_cols[0]].sum()
+            self.root.after(0, self._render_results, query, df, plot_data)
         except Exception as e:
-            logging.error(f"Query failed: {str(e)}")
-            messagebox.showerror("Error", f"Query failed: {str(e)}")
+            self.root.after(0, self._query_failed, e)
+
+    def _render_results(self, query, df, plot_data):
+        # Update treeview columns based on query results
+        self.tree.configure(columns=tuple(df.columns), show='headings')
+        for col in df.columns:
+            self.tree.heading(col, text=col)
+        self._size_tree_columns()
+        
+        self._set_tree_source(
+            lambda offset, limit: list(df.iloc[offset:offset + limit].itertuples(index=False, name=None))
+        )
+        
+        # Update visualization if applicable, once the tree has been drawn
+        if 'SELECT' in query.upper() and len(df.columns) >= 2:
+            self.root.after_idle(self._plot_query_results, df, plot_data)
+        
+        self.query_button.state(['!disabled'])
+        messagebox.showinfo("Query Result", f"Query executed successfully. Rows returned: {len(df)}")
+
+    def _plot_query_results(self, df, plot_data):
+        for widget in self.plot_frame.winfo_children():
+            widget.destroy()
+        if plot_data is None:
+            return
+        
+        fig, ax = plt.subplots(figsize=(8, 4))
+        plot_data.plot(kind='bar', ax=ax, color='#2ca02c')
+        ax.set_title('Query Results')
+        ax.set_xlabel(df.columns[0])
+        ax.set_ylabel(plot_data.name)
+        ax.tick_params(axis='x', rotation=45)
+        canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
+        canvas.draw_idle()
+        canvas.get_tk_widget().pack()
+
+    def _query_failed(self, e):
+        self.query_button.state(['!disabled'])
+        logging.error(f"Query failed: {str(e)}")
+        messagebox.showerror("Error", f"Query failed: {str(e)}")
 
     def __del__(self):
+        self.conn.execute('PRAGMA optimize')
         self.conn.close()
 
 